@@ -4,6 +4,8 @@ from langchain_core.prompt_values import StringPromptValue
 from langchain_core.language_models.llms import LLMResult
 from langchain_core.callbacks.manager import Callbacks
 from typing import List, Any, Union, Optional
+import asyncio
+from utils import current_deadline, DeadlineExceeded
 
 class CompatibleChatOpenAI(ChatOpenAI):
     """A wrapper around ChatOpenAI that handles ragas compatibility issues"""
@@ -15,6 +17,19 @@ class CompatibleChatOpenAI(ChatOpenAI):
         # This method is called by ragas but we don't need to do anything specific
         pass
     
+    async def _within_deadline(self, call):
+        """Bound a judge call by the enclosing deadline_scope, if there is one"""
+        deadline = current_deadline()
+        if deadline is None:
+            return await call
+        if deadline.expired():
+            call.close()
+            raise DeadlineExceeded("judge call started after its deadline")
+        try:
+            return await asyncio.wait_for(call, timeout=deadline.remaining())
+        except asyncio.TimeoutError as exc:
+            raise DeadlineExceeded("judge call did not finish before its deadline") from exc
+
     def _convert_to_message_lists(self, messages):
         if isinstance(messages, StringPromptValue):
             return [[HumanMessage(content=messages.text)]]
@@ -61,12 +76,12 @@ class CompatibleChatOpenAI(ChatOpenAI):
         **kwargs: Any,
     ) -> LLMResult:
         converted_messages = self._convert_to_message_lists(messages)
-        return await super().agenerate(
+        return await self._within_deadline(super().agenerate(
             converted_messages,
             stop=stop,
             callbacks=callbacks,
             **kwargs
-        )
+        ))
 
     async def agenerate(
         self,
@@ -76,9 +91,9 @@ class CompatibleChatOpenAI(ChatOpenAI):
         **kwargs: Any,
     ) -> LLMResult:
         converted_messages = self._convert_to_message_lists(messages)
-        return await super().agenerate(
+        return await self._within_deadline(super().agenerate(
             converted_messages,
             stop=stop,
             callbacks=callbacks,
             **kwargs
-        ) 
\ No newline at end of file
+        )) 
\ No newline at end of file
@@ -4,11 +4,20 @@ import os
 from dotenv import load_dotenv
 from ragas import SingleTurnSample, MultiTurnSample, HumanMessage, AIMessage
 from compatible_chat_openai import CompatibleChatOpenAI
-from utils import get_llm_response
+from utils import get_llm_response, rag_latency
 
 # Load environment variables
 load_dotenv()
 
+def pytest_terminal_summary(terminalreporter):
+    stats = rag_latency.stats()
+    if stats["calls"]:
+        terminalreporter.write_sep("-", "RAG latency")
+        terminalreporter.write_line(", ".join(
+            f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in stats.items()
+        ))
+
 @pytest.fixture 
 def llm_wrapper():
     api_key = os.getenv("OPENAI_API_KEY")
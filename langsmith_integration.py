@@ -4,12 +4,12 @@ from typing import Dict, Any, List
 from dotenv import load_dotenv
 from langsmith import Client
 from langsmith.run_helpers import traceable
-from ragas import evaluate, EvaluationDataset
+from ragas import evaluate, EvaluationDataset, RunConfig
 from ragas.metrics import ResponseRelevancy, FactualCorrectness, LLMContextPrecisionWithoutReference
 from ragas.embeddings import LangchainEmbeddingsWrapper
 from langchain_openai import OpenAIEmbeddings
 from compatible_chat_openai import CompatibleChatOpenAI
-from utils import load_test_data, get_llm_response
+from utils import load_test_data, get_llm_response, deadline_scope, rag_latency, DeadlineExceeded
 
 # Load environment variables
 load_dotenv()
@@ -35,7 +35,8 @@ class LangSmithRagasIntegration:
     async def evaluate_with_langsmith(self, 
                                     test_data: Dict[str, Any], 
                                     metrics: List = None,
-                                    llm_wrapper = None) -> Any:
+                                    llm_wrapper = None,
+                                    deadline: float = None) -> Any:
         """
         Run RAGAS evaluation and upload results to LangSmith.
         
@@ -43,6 +44,8 @@ class LangSmithRagasIntegration:
             test_data: Test data containing question, reference, etc.
             metrics: List of RAGAS metrics to evaluate
             llm_wrapper: LLM wrapper for evaluation
+            deadline: Seconds allowed for the RAG and judge calls of this test case,
+                bounded by any enclosing deadline_scope
             
         Returns:
             Dictionary containing evaluation results
@@ -61,6 +64,13 @@ class LangSmithRagasIntegration:
                 LLMContextPrecisionWithoutReference(llm=llm_wrapper)
             ]
         
+        with deadline_scope(deadline) as active_deadline:
+            return await self._evaluate(test_data, metrics, active_deadline)
+
+    async def _evaluate(self, test_data: Dict[str, Any], metrics: List, deadline) -> Any:
+        """
+        Fetch the RAG answer, score it and upload the results, all within the given deadline.
+        """
         # Get LLM response
         response_dict = get_llm_response(test_data)
         response_json = response_dict.json()
@@ -84,8 +94,17 @@ class LangSmithRagasIntegration:
         
         dataset = EvaluationDataset([sample])
         
-        # Run evaluation
-        results = evaluate(dataset=dataset, metrics=metrics)
+        # Run evaluation. Under a deadline each judge call gets only the time left,
+        # and retries are disabled so backoff sleeps cannot outlast the deadline.
+        run_config = RunConfig()
+        if deadline is not None:
+            if deadline.expired():
+                raise DeadlineExceeded("test case deadline exceeded before evaluation")
+            run_config = RunConfig(timeout=deadline.remaining(), max_retries=1, max_wait=0)
+        results = evaluate(dataset=dataset, metrics=metrics, run_config=run_config)
+        # ragas turns judge timeouts into NaN scores; don't upload those as real results
+        if deadline is not None and deadline.expired():
+            raise DeadlineExceeded("test case deadline exceeded during evaluation")
         
         # Upload results to LangSmith
         try:
@@ -153,24 +172,40 @@ class LangSmithRagasIntegration:
     
     async def batch_evaluate(self, 
                            test_data_list: List[Dict[str, Any]], 
-                           llm_wrapper = None) -> List[Any]:
+                           llm_wrapper = None,
+                           deadline: float = None,
+                           case_deadline: float = None) -> List[Any]:
         """
         Run batch evaluation on multiple test cases and upload all results to LangSmith.
         
         Args:
             test_data_list: List of test data dictionaries
             llm_wrapper: LLM wrapper for evaluation
+            deadline: Seconds allowed for the whole batch
+            case_deadline: Seconds allowed for each test case, bounded by the batch deadline
             
         Returns:
-            List of evaluation results
+            List of evaluation results, with None for each test case that timed out
+            or was not reached before the batch deadline
         """
         results = []
         
-        for i, test_data in enumerate(test_data_list):
-            print(f"Evaluating test case {i+1}/{len(test_data_list)}")
-            result = await self.evaluate_with_langsmith(test_data, llm_wrapper=llm_wrapper)
-            results.append(result)
-        
+        with deadline_scope(deadline) as batch_deadline:
+            for i, test_data in enumerate(test_data_list):
+                if batch_deadline is not None and batch_deadline.expired():
+                    print(f"Batch deadline exceeded, skipping {len(test_data_list) - i} remaining test case(s)")
+                    results.extend([None] * (len(test_data_list) - i))
+                    break
+                print(f"Evaluating test case {i+1}/{len(test_data_list)}")
+                try:
+                    result = await self.evaluate_with_langsmith(test_data, llm_wrapper=llm_wrapper,
+                                                                deadline=case_deadline)
+                except DeadlineExceeded as e:
+                    print(f"Test case {i+1} timed out: {e}")
+                    result = None
+                results.append(result)
+        
+        print(f"RAG latency: {rag_latency.stats()}")
         return results
 
 # Example usage function
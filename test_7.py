@@ -0,0 +1,217 @@
+import json
+import threading
+import time
+import asyncio
+import functools
+import pytest
+import requests
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from langchain_openai import ChatOpenAI
+from compatible_chat_openai import CompatibleChatOpenAI
+import langsmith_integration
+from utils import get_llm_response, deadline_scope, DeadlineExceeded, LatencyTracker
+
+
+class StandInRag:
+    """
+    Local stand-in for the RAG endpoint that sleeps for a scripted latency per request.
+
+    Each script entry is a latency in seconds, or a (latency, status) pair.
+    """
+
+    def __init__(self, latencies):
+        self.latencies = list(latencies)
+        self.requests = 0
+        lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with lock:
+                    index = stand_in.requests
+                    stand_in.requests += 1
+                latency = stand_in.latencies[index] if index < len(stand_in.latencies) else 0.0
+                latency, status = latency if isinstance(latency, tuple) else (latency, 200)
+                time.sleep(latency)
+                payload = json.dumps({"answer": body["question"], "request": index}).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except OSError:
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}/rag-llm/ask"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_in(request):
+    server = StandInRag(request.param)
+    yield server
+    server.close()
+
+
+@pytest.mark.parametrize("stand_in", [[2.0]], indirect=True)
+def test_deadline_propagates_to_rag_call(stand_in):
+    tracker = LatencyTracker()
+    started = time.monotonic()
+    with deadline_scope(5.0):
+        with deadline_scope(0.3):
+            with pytest.raises(DeadlineExceeded):
+                get_llm_response({"question": "slow"}, url=stand_in.url, tracker=tracker)
+    assert time.monotonic() - started < 1.0
+    stats = tracker.stats()
+    assert stats["timeouts"] == 1
+    assert stats["max"] <= 0.3
+
+
+@pytest.mark.parametrize("stand_in", [[2.0]], indirect=True)
+def test_explicit_deadline_cannot_extend_scope(stand_in):
+    tracker = LatencyTracker()
+    started = time.monotonic()
+    with deadline_scope(0.3):
+        with pytest.raises(DeadlineExceeded):
+            get_llm_response({"question": "slow"}, deadline=60.0, url=stand_in.url, tracker=tracker)
+    assert time.monotonic() - started < 1.0
+
+
+@pytest.mark.parametrize("stand_in", [[0.01] * 10 + [2.0]], indirect=True)
+def test_hedged_request_cuts_tail(stand_in):
+    tracker = LatencyTracker(max_hedge_rate=0.1, min_samples=10)
+    for _ in range(10):
+        get_llm_response({"question": "warm up"}, url=stand_in.url, tracker=tracker, hedge=True)
+
+    started = time.monotonic()
+    response = get_llm_response({"question": "tail"}, deadline=5.0, url=stand_in.url,
+                                tracker=tracker, hedge=True)
+    stats = tracker.stats()
+    assert time.monotonic() - started < 1.0
+    assert response.json()["request"] == 11
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+    assert stats["hedge_rate"] <= 0.1
+
+
+@pytest.mark.parametrize("stand_in", [[0.01] * 10 + [0.5]], indirect=True)
+def test_hedge_rate_cap(stand_in):
+    tracker = LatencyTracker(max_hedge_rate=0.0, min_samples=10)
+    for _ in range(10):
+        get_llm_response({"question": "warm up"}, url=stand_in.url, tracker=tracker, hedge=True)
+
+    response = get_llm_response({"question": "tail"}, deadline=5.0, url=stand_in.url,
+                                tracker=tracker, hedge=True)
+    assert response.json()["request"] == 10
+    assert tracker.stats()["hedges"] == 0
+    assert stand_in.requests == 11
+
+
+@pytest.mark.parametrize("stand_in", [[0.01] * 10 + [(0.3, 503), 0.6]], indirect=True)
+def test_server_error_does_not_beat_pending_hedge(stand_in):
+    tracker = LatencyTracker(max_hedge_rate=0.1, min_samples=10)
+    for _ in range(10):
+        get_llm_response({"question": "warm up"}, url=stand_in.url, tracker=tracker, hedge=True)
+
+    response = get_llm_response({"question": "tail"}, deadline=5.0, url=stand_in.url,
+                                tracker=tracker, hedge=True)
+    assert response.status_code == 200
+    assert response.json()["request"] == 11
+    assert tracker.stats()["hedge_wins"] == 1
+
+
+@pytest.mark.parametrize("stand_in", [[]], indirect=True)
+def test_failed_call_is_recorded(stand_in):
+    tracker = LatencyTracker()
+    url = stand_in.url
+    stand_in.close()
+    with pytest.raises(requests.ConnectionError):
+        get_llm_response({"question": "down"}, deadline=5.0, url=url, tracker=tracker)
+    stats = tracker.stats()
+    assert stats["failures"] == 1 and stats["timeouts"] == 0
+    assert "max" in stats
+
+
+@pytest.fixture
+def slow_judge(monkeypatch):
+    async def slow_agenerate(self, messages, stop=None, callbacks=None, **kwargs):
+        await asyncio.sleep(1.5)
+        return "judged"
+
+    monkeypatch.setattr(ChatOpenAI, "agenerate", slow_agenerate)
+    return CompatibleChatOpenAI(model="gpt-4o-mini", temperature=0, api_key="test")
+
+
+@pytest.mark.asyncio
+async def test_deadline_propagates_to_judge_call(slow_judge):
+    started = time.monotonic()
+    with deadline_scope(0.1):
+        with pytest.raises(DeadlineExceeded):
+            await slow_judge.agenerate("Is this faithful?")
+    assert time.monotonic() - started < 1.0
+
+    assert await slow_judge.agenerate("Is this faithful?") == "judged"
+
+
+class FakeLangSmithClient:
+    def __init__(self):
+        self.runs = []
+
+    def read_project(self, project_name):
+        pass
+
+    def create_run(self, **kwargs):
+        self.runs.append(kwargs)
+        return SimpleNamespace(id=len(self.runs))
+
+
+@pytest.mark.parametrize("stand_in", [[0.01, 2.0, 0.01, 0.01, 0.01]], indirect=True)
+@pytest.mark.asyncio
+async def test_batch_deadline_propagates_to_cases(stand_in, monkeypatch):
+    run_configs = []
+
+    def fake_evaluate(dataset, metrics, run_config):
+        # Stands in for ragas: a slow judge runs until its RunConfig timeout and scores NaN
+        run_configs.append(run_config)
+        if dataset.samples[0].user_input.startswith("slow judge"):
+            time.sleep(run_config.timeout)
+            return {"score": [float("nan")]}
+        return {"score": [1.0]}
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(langsmith_integration, "Client", FakeLangSmithClient)
+    monkeypatch.setattr(langsmith_integration, "evaluate", fake_evaluate)
+    monkeypatch.setattr(langsmith_integration, "get_llm_response",
+                        functools.partial(get_llm_response, url=stand_in.url))
+
+    integration = langsmith_integration.LangSmithRagasIntegration()
+    test_data_list = [
+        {"question": "fast"},
+        {"question": "slow rag"},
+        {"question": "slow judge"},
+        {"question": "fast"},
+        {"question": "slow judge past the batch deadline"},
+        {"question": "never reached"},
+    ]
+
+    started = time.monotonic()
+    results = await integration.batch_evaluate(test_data_list, deadline=1.5, case_deadline=0.5)
+    elapsed = time.monotonic() - started
+
+    assert results[0] == {"score": [1.0]} and results[3] == {"score": [1.0]}
+    assert results[1:3] == [None, None] and results[4:] == [None, None]
+    assert len(integration.client.runs) == 2
+    assert elapsed < 3.0
+    assert stand_in.requests <= 5
+    assert all(config.max_retries == 1 and config.timeout <= 0.5 for config in run_configs)
@@ -1,19 +1,261 @@
 import requests
 import os
 import json
+import time
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+RAG_URL = "https://rahulshettyacademy.com/rag-llm/ask"
+DEFAULT_TIMEOUT = 30.0
+
+_current_deadline = contextvars.ContextVar("current_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call cannot finish before its deadline."""
+
+
+class Deadline:
+    """An absolute point in time that a call (and everything it calls) must finish by."""
+
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def timeout(self):
+        """Return the time left, raising DeadlineExceeded if there is none."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded("deadline exceeded")
+        return remaining
+
+
+def current_deadline():
+    return _current_deadline.get()
+
+
+def _within_current(deadline):
+    """Return whichever expires first: deadline or the enclosing deadline_scope's."""
+    parent = _current_deadline.get()
+    if parent is not None and parent.expires_at < deadline.expires_at:
+        return parent
+    return deadline
+
+
+@contextmanager
+def deadline_scope(seconds):
+    """
+    Set a deadline for every RAG and judge call made inside the block.
+
+    A nested scope can only tighten the enclosing deadline, never extend it.
+    Passing None leaves the enclosing deadline (if any) in place.
+    """
+    if seconds is None:
+        yield _current_deadline.get()
+        return
+    deadline = _within_current(Deadline(seconds))
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class LatencyTracker:
+    """
+    Tracks call latencies and decides when a hedged request may be sent.
+
+    Args:
+        max_hedge_rate: Maximum fraction of calls that may send a hedge
+        min_samples: Number of latencies needed before the p95 is trusted for hedging
+        window: Number of most recent latencies kept
+    """
+
+    def __init__(self, max_hedge_rate=0.1, min_samples=10, window=1000):
+        self.max_hedge_rate = max_hedge_rate
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def start_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def record(self, latency, hedged_win=False):
+        with self._lock:
+            self._latencies.append(latency)
+            if hedged_win:
+                self.hedge_wins += 1
+
+    def record_failure(self, latency):
+        """Count a call that failed outright; its elapsed time still counts towards the percentiles."""
+        with self._lock:
+            self._latencies.append(latency)
+            self.failures += 1
+
+    def record_timeout(self, latency):
+        """Count a call that hit its deadline; its elapsed time still counts towards the percentiles."""
+        with self._lock:
+            self._latencies.append(latency)
+            self.timeouts += 1
+
+    def hedge_delay(self):
+        """Return the p95 latency, or None while there are too few samples to hedge on."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            return _percentile(self._latencies, 95)
+
+    def try_acquire_hedge(self):
+        """Reserve a hedge if doing so keeps the hedge rate within max_hedge_rate."""
+        with self._lock:
+            if self.calls == 0 or (self.hedges + 1) / self.calls > self.max_hedge_rate:
+                return False
+            self.hedges += 1
+            return True
+
+    def stats(self):
+        with self._lock:
+            latencies = list(self._latencies)
+            stats = {
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "timeouts": self.timeouts,
+                "failures": self.failures,
+                "hedge_rate": self.hedges / self.calls if self.calls else 0.0,
+            }
+        if latencies:
+            stats.update({
+                "p50": _percentile(latencies, 50),
+                "p95": _percentile(latencies, 95),
+                "p99": _percentile(latencies, 99),
+                "max": max(latencies),
+            })
+        return stats
+
+
+rag_latency = LatencyTracker()
+
 
 def load_test_data(file_name):
     test_data_path = os.path.join(os.path.dirname(__file__), "test_data", file_name)
     with open(test_data_path) as file:
         return json.load(file)
 
-def get_llm_response(test_data):
-    response_dict = requests.post("https://rahulshettyacademy.com/rag-llm/ask", json={
+def _post(url, payload, deadline):
+    return requests.post(url, json=payload, timeout=deadline.timeout())
+
+def get_llm_response(test_data, deadline=None, hedge=None, url=RAG_URL, tracker=None):
+    """
+    Ask the RAG endpoint a question, bounded by a deadline and optionally hedged.
+
+    Args:
+        test_data: Test data containing the question
+        deadline: Deadline or seconds, bounded by any enclosing deadline_scope;
+            defaults to the enclosing deadline_scope, else RAG_TIMEOUT
+            (or DEFAULT_TIMEOUT) seconds
+        hedge: Send a duplicate request once the call outlives the p95 latency;
+            defaults to the RAG_HEDGE environment variable
+        url: RAG endpoint to call
+        tracker: LatencyTracker to record into; defaults to rag_latency
+
+    Returns:
+        The first requests.Response that is not a server error (5xx), or the
+        server error if no other request is still in flight
+
+    Raises:
+        DeadlineExceeded: If no response arrives before the deadline
+        requests.RequestException: If every request fails before the deadline
+    """
+    if deadline is None:
+        deadline = current_deadline() or Deadline(float(os.getenv("RAG_TIMEOUT", DEFAULT_TIMEOUT)))
+    else:
+        if not isinstance(deadline, Deadline):
+            deadline = Deadline(deadline)
+        deadline = _within_current(deadline)
+    if hedge is None:
+        hedge = os.getenv("RAG_HEDGE") == "1"
+    if tracker is None:
+        tracker = rag_latency
+
+    payload = {
         "question": test_data["question"],
         "chat_history": []
-    })
+    }
+
+    # Each call gets its own executor (one worker for the primary, one for the hedge)
+    # rather than sharing a pool. A losing hedge or an abandoned primary cannot be
+    # cancelled and keeps its thread until requests gives up. The timeout requests
+    # enforces applies to each socket read, not the whole response. With a shared pool
+    # those leftovers would queue new calls behind them while their clocks run. The
+    # cost is a thread start per request, which is small next to a RAG round trip.
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rag-call")
+    try:
+        return _first_response(executor, url, payload, deadline, hedge, tracker)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def _first_response(executor, url, payload, deadline, hedge, tracker):
+    tracker.start_call()
+    started = time.monotonic()
+    primary = executor.submit(_post, url, payload, deadline)
+    pending = {primary}
+    hedge_delay = tracker.hedge_delay() if hedge else None
+    error = None
+    server_error = None
+
+    while pending:
+        if hedge_delay is not None and len(pending) == 1 and primary in pending:
+            wait_for = min(deadline.remaining(), max(0.0, started + hedge_delay - time.monotonic()))
+        else:
+            wait_for = deadline.remaining()
+        done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
 
-    return response_dict
+        for future in done:
+            try:
+                response = future.result()
+            except Exception as exc:
+                error = exc
+                continue
+            # A 5xx only wins if the other request has nothing better to offer
+            if response.status_code >= 500 and pending:
+                server_error = response
+                continue
+            tracker.record(time.monotonic() - started, hedged_win=future is not primary)
+            return response
 
+        if deadline.expired():
+            break
+        if hedge_delay is not None and not done and primary in pending:
+            if tracker.try_acquire_hedge():
+                pending.add(executor.submit(_post, url, payload, deadline))
+            hedge_delay = None
 
-   
\ No newline at end of file
+    if server_error is not None:
+        tracker.record(time.monotonic() - started)
+        return server_error
+    if error is not None and not isinstance(error, requests.Timeout) and not deadline.expired():
+        tracker.record_failure(time.monotonic() - started)
+        raise error
+    tracker.record_timeout(min(time.monotonic(), deadline.expires_at) - started)
+    raise DeadlineExceeded(f"RAG call did not finish before its deadline ({url})") from error